@@ -1,8 +1,18 @@
+import json
+import os
+import uuid
+import numpy as np
 import streamlit as st
-import yfinance as yf
 import pandas as pd
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
+from pathlib import Path
+from indicator_spec import INDICATOR_COLUMNS, INDICATOR_VERSION, STATE_SIZE, TAIL
+try:
+    # Built by `make aot`; skips importing numba and JIT compilation on cold start
+    from indicators_aot import update_indicators
+except ImportError:
+    from indicators import update_indicators
 
 st.set_page_config(page_title="TSLA Analysis", layout="wide")
 st.title("🚗 Tesla (TSLA) Stock Technical Analysis - Last 1 Year")
@@ -11,104 +21,260 @@ st.title("🚗 Tesla (TSLA) Stock Technical Analysis - Last 1 Year")
 end_date = datetime.today()
 start_date = end_date - timedelta(days=365)
 
-# Fetch data with strong caching and friendly error
-@st.cache_data(ttl=3600, show_spinner="Fetching last 1 year TSLA data...")
-def get_data():
+# Persistent on-disk cache so warm starts skip the download entirely
+SOURCE = "yfinance"
+SYMBOL = "TSLA"
+PERIOD = "1y"
+CACHE_DIR = Path.home() / ".cache" / "tsla_app"
+CACHE_TTL = 3600
+# Adjusted history is re-downloaded in full at least this often, and whenever
+# Yahoo has rewritten it (splits/dividends shift every earlier adjusted bar)
+FULL_REFRESH_DAYS = 7
+# After a failed live fetch, serve the cache without calling the provider for this long
+RETRY_BACKOFF = 300
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+def _cache_path(period):
+    return CACHE_DIR / f"{SOURCE}_{SYMBOL}_{period}.parquet"
+
+def _read_cache(period):
+    # A missing or unreadable (e.g. truncated) cache file is just a cache miss
+    path = _cache_path(period)
     try:
-        df = yf.download("TSLA", start=start_date, end=end_date + timedelta(days=1), progress=False)
-        if df.empty:
-            raise ValueError("No data returned.")
-        return df
-    except Exception as e:
-        st.error("Temporary Yahoo Finance rate limit (very common on free Streamlit). Wait 30-60 minutes and click 'Rerun' — it WILL work after the limit clears!")
-        return pd.DataFrame()
+        return pd.read_parquet(path) if path.exists() else None
+    except (OSError, ValueError):
+        return None
+
+def _replace_atomically(path, write):
+    # Write to a temp file and rename it over the target so concurrent sessions
+    # and crashes mid-write never leave a partial file behind
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+def _load_meta(period):
+    try:
+        return json.loads(_cache_path(period).with_suffix(".json").read_text())
+    except (OSError, ValueError):
+        return {}
+
+def _write_meta(period, df, **extra):
+    meta = {"fetched_at": datetime.now().isoformat(timespec="seconds"),
+            "last_bar": df.index[-1].strftime("%Y-%m-%d"),
+            "provider": SOURCE, "rows": len(df), **extra}
+    _replace_atomically(_cache_path(period).with_suffix(".json"), lambda p: p.write_text(json.dumps(meta)))
+
+def _write_cache(period, df, **extra):
+    _replace_atomically(_cache_path(period), lambda p: df.to_parquet(p, compression="zstd"))
+    _write_meta(period, df, **extra)
+
+# One Ticker reuses yfinance's shared keep-alive session across fetches and reruns
+@st.cache_resource
+def _ticker():
+    # Imported lazily: warm starts served from the Parquet cache never need yfinance
+    import yfinance as yf
+    return yf.Ticker(SYMBOL)
+
+def _download(start, end):
+    # raise_errors makes rate limits/HTTP errors raise (and hit the stale fallback)
+    # instead of coming back as an empty frame
+    df = _ticker().history(start=start, end=end + timedelta(days=1), auto_adjust=True, raise_errors=True)
+    df.index = df.index.tz_localize(None)
+    # float32 is ample precision for prices and halves memory per column
+    return df[OHLCV_COLUMNS].astype(np.float32)
 
-df = get_data()
-if df.empty:
-    st.stop()
+def _refresh(cached):
+    """Append bars since the cache was written, or None if the cached history was revised."""
+    # Start one bar before last_bar: last_bar may be a partial intraday bar (the dedupe
+    # keeps the re-downloaded one), while the bar before it is final and must still match
+    anchor = cached.index[-2] if len(cached) > 1 else cached.index[-1]
+    new = _download(anchor.to_pydatetime(), end_date)
+    if anchor not in new.index or not np.isclose(new.at[anchor, "Close"], cached.at[anchor, "Close"], rtol=1e-4):
+        return None
+    df = pd.concat([cached, new])
+    return df[~df.index.duplicated(keep="last")].sort_index()
 
-# Indicators (pure pandas - no extra libs)
-df["SMA20"] = df["Close"].rolling(window=20).mean()
-df["SMA50"] = df["Close"].rolling(window=50).mean()
+def _fetch(period):
+    meta = _load_meta(period)
+    cached = _read_cache(period) if meta else None
+    df = None
+    if cached is not None:
+        age = datetime.now() - datetime.fromisoformat(meta["fetched_at"])
+        if age.total_seconds() < CACHE_TTL:
+            return cached
+        full_fetch_at = meta.get("full_fetch_at", meta["fetched_at"])
+        if datetime.now() - datetime.fromisoformat(full_fetch_at) < timedelta(days=FULL_REFRESH_DAYS):
+            df = _refresh(cached)
+    if df is None:
+        df = _download(start_date, end_date)
+        full_fetch_at = datetime.now().isoformat(timespec="seconds")
+    if df.empty:
+        raise ValueError("No data returned.")
+    _write_cache(period, df, full_fetch_at=full_fetch_at)
+    return df
 
-delta = df["Close"].diff()
-gain = delta.where(delta > 0, 0).rolling(window=14).mean()
-loss = -delta.where(delta < 0, 0).rolling(window=14).mean()
-rs = gain / loss
-df["RSI"] = 100 - (100 / (1 + rs))
+# Fetch data with strong caching; failures raise so they are never cached.
+# Returns the full cached history so indicator state stays valid; trimmed for display below.
+@st.cache_data(ttl=CACHE_TTL, show_spinner="Fetching last 1 year TSLA data...")
+def get_data():
+    return _fetch(PERIOD)
+
+def _record_failure(period, error):
+    # Cleared by the next successful _write_meta
+    meta = {**_load_meta(period), "failed_at": datetime.now().isoformat(timespec="seconds"), "error": error}
+    _replace_atomically(_cache_path(period).with_suffix(".json"), lambda p: p.write_text(json.dumps(meta)))
+
+stale_ok = st.sidebar.toggle("Show cached data if live fetch fails", value=True)
+
+# Reruns during an outage back off instead of hitting the provider again
+meta = _load_meta(PERIOD)
+error = None
+if "failed_at" in meta and (datetime.now() - datetime.fromisoformat(meta["failed_at"])).total_seconds() < RETRY_BACKOFF:
+    error = meta["error"]
+else:
+    try:
+        df = get_data()
+    except Exception as e:
+        error = str(e)
+        _record_failure(PERIOD, error)
+if error is not None:
+    df = _read_cache(PERIOD) if stale_ok else None
+    if df is None:
+        st.error("Temporary Yahoo Finance rate limit (very common on free Streamlit). Wait 30-60 minutes and click 'Rerun' — it WILL work after the limit clears!")
+        st.stop()
+    st.warning(f"Live fetch failed ({error}); showing data cached at {meta.get('fetched_at')}.")
 
-ema12 = df["Close"].ewm(span=12, adjust=False).mean()
-ema26 = df["Close"].ewm(span=26, adjust=False).mean()
-df["MACD"] = ema12 - ema26
-df["Signal"] = df["MACD"].ewm(span=9, adjust=False).mean()
-df["MACD_Hist"] = df["MACD"] - df["Signal"]
+# O(1) cache key for a price frame instead of hashing every row
+def _df_fingerprint(d):
+    return (len(d), d.index[-1].value, float(d["Close"].iat[-1]))
 
-df["BB_Middle"] = df["Close"].rolling(window=20).mean()
-bb_std = df["Close"].rolling(window=20).std()
-df["BB_Upper"] = df["BB_Middle"] + (bb_std * 2)
-df["BB_Lower"] = df["BB_Middle"] - (bb_std * 2)
+# Indicators (one fused Numba pass over Close), persisted with their running state
+# so a refresh only folds in the newly appended bars; computed once per data snapshot
+@st.cache_data(max_entries=4, hash_funcs={pd.DataFrame: _df_fingerprint})
+def compute_indicators(df):
+    name = f"{PERIOD}_indicators"
+    meta = _load_meta(name)
+    # A column view of a 2-D block can be strided; ascontiguousarray only copies in that case
+    close = np.ascontiguousarray(df["Close"].to_numpy(np.float32))
+    # Rows and state produced by a different kernel or column layout are never reused
+    schema = {"version": INDICATOR_VERSION, "columns": INDICATOR_COLUMNS}
+    cached = _read_cache(name) if "state" in meta and meta.get("schema") == schema else None
+    n = len(cached) if cached is not None else 0
+    tail = np.array(meta.get("tail_close", []), dtype=np.float32)
+    # Resume only if the cached rows are a prefix of df with unrevised trailing closes
+    if n and n <= len(df) and cached.index[-1] == df.index[n - 1] and np.array_equal(tail, close[n - len(tail):n]):
+        if n == len(df):
+            return cached
+        state = np.array(meta["state"])
+        rows = update_indicators(state, tail, close[n:])
+        ind = pd.concat([cached, pd.DataFrame(rows, index=df.index[n:], columns=INDICATOR_COLUMNS)])
+    else:
+        state = np.zeros(STATE_SIZE)
+        ind = pd.DataFrame(update_indicators(state, close[:0], close), index=df.index, columns=INDICATOR_COLUMNS)
+    _write_cache(name, ind, schema=schema, state=state.tolist(), tail_close=close[-TAIL:].tolist())
+    return ind
 
-plot_df = df.dropna().reset_index()
+df = df.join(compute_indicators(df))
+df["BB_Middle"] = df["SMA20"]
+df = df.loc[pd.Timestamp(start_date.date()):]
 
 # Prediction horizon
 horizon = st.sidebar.selectbox("Prediction Horizon (days)", [1, 5])
 
-# Tabs
-tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(["Candlestick + Volume", "Moving Averages", "RSI", "MACD", "Bollinger Bands", "Buy/Sell Prediction"])
+# Figures are cached on the same fingerprint so reruns are pure lookups
+cache_figure = st.cache_resource(max_entries=8, hash_funcs={pd.DataFrame: _df_fingerprint})
 
-with tab1:
+# Longest indicator warmup (SMA50); plots start after it via array views, not a dropna() copy
+WARMUP = 49
+
+def _plot_arrays(d, columns):
+    plot = {"Date": d.index.values[WARMUP:]}
+    for c in columns:
+        plot[c] = d[c].to_numpy()[WARMUP:]
+    return plot
+
+@cache_figure
+def build_candlestick(df):
+    plot = _plot_arrays(df, OHLCV_COLUMNS)
     fig = go.Figure()
-    fig.add_trace(go.Candlestick(x=plot_df["Date"], open=plot_df["Open"], high=plot_df["High"],
-                                 low=plot_df["Low"], close=plot_df["Close"], name="Price"))
-    fig.add_trace(go.Bar(x=plot_df["Date"], y=plot_df["Volume"], name="Volume", yaxis="y2"))
+    fig.add_trace(go.Candlestick(x=plot["Date"], open=plot["Open"], high=plot["High"],
+                                 low=plot["Low"], close=plot["Close"], name="Price"))
+    fig.add_trace(go.Bar(x=plot["Date"], y=plot["Volume"], name="Volume", yaxis="y2"))
     fig.update_layout(title="TSLA Candlestick + Volume (Last 1 Year)", yaxis2=dict(title="Volume", overlaying="y", side="right"))
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
-with tab2:
+@cache_figure
+def build_moving_averages(df):
+    plot = _plot_arrays(df, ["Close", "SMA20", "SMA50"])
     fig = go.Figure()
-    fig.add_trace(go.Scatter(x=plot_df["Date"], y=plot_df["Close"], name="Close"))
-    fig.add_trace(go.Scatter(x=plot_df["Date"], y=plot_df["SMA20"], name="SMA 20"))
-    fig.add_trace(go.Scatter(x=plot_df["Date"], y=plot_df["SMA50"], name="SMA 50"))
+    fig.add_trace(go.Scatter(x=plot["Date"], y=plot["Close"], name="Close"))
+    fig.add_trace(go.Scatter(x=plot["Date"], y=plot["SMA20"], name="SMA 20"))
+    fig.add_trace(go.Scatter(x=plot["Date"], y=plot["SMA50"], name="SMA 50"))
     fig.update_layout(title="Moving Averages (20 & 50)")
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
-with tab3:
-    fig = go.Figure(go.Scatter(x=plot_df["Date"], y=plot_df["RSI"], name="RSI"))
+@cache_figure
+def build_rsi(df):
+    plot = _plot_arrays(df, ["RSI"])
+    fig = go.Figure(go.Scatter(x=plot["Date"], y=plot["RSI"], name="RSI"))
     fig.add_hline(y=70, line_dash="dash", line_color="red", annotation_text="Overbought")
     fig.add_hline(y=30, line_dash="dash", line_color="green", annotation_text="Oversold")
     fig.update_layout(title="RSI (14)", yaxis=dict(range=[0, 100]))
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
-with tab4:
+@cache_figure
+def build_macd(df):
+    plot = _plot_arrays(df, ["MACD", "Signal", "MACD_Hist"])
     fig = go.Figure()
-    fig.add_trace(go.Scatter(x=plot_df["Date"], y=plot_df["MACD"], name="MACD"))
-    fig.add_trace(go.Scatter(x=plot_df["Date"], y=plot_df["Signal"], name="Signal"))
-    fig.add_trace(go.Bar(x=plot_df["Date"], y=plot_df["MACD_Hist"], name="Histogram"))
+    fig.add_trace(go.Scatter(x=plot["Date"], y=plot["MACD"], name="MACD"))
+    fig.add_trace(go.Scatter(x=plot["Date"], y=plot["Signal"], name="Signal"))
+    fig.add_trace(go.Bar(x=plot["Date"], y=plot["MACD_Hist"], name="Histogram"))
     fig.update_layout(title="MACD")
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
-with tab5:
+@cache_figure
+def build_bollinger(df):
+    plot = _plot_arrays(df, ["Close", "BB_Upper", "BB_Middle", "BB_Lower"])
     fig = go.Figure()
-    fig.add_trace(go.Scatter(x=plot_df["Date"], y=plot_df["Close"], name="Close"))
-    fig.add_trace(go.Scatter(x=plot_df["Date"], y=plot_df["BB_Upper"], name="Upper Band", line=dict(dash="dash")))
-    fig.add_trace(go.Scatter(x=plot_df["Date"], y=plot_df["BB_Middle"], name="Middle Band"))
-    fig.add_trace(go.Scatter(x=plot_df["Date"], y=plot_df["BB_Lower"], name="Lower Band", line=dict(dash="dash")))
+    fig.add_trace(go.Scatter(x=plot["Date"], y=plot["Close"], name="Close"))
+    fig.add_trace(go.Scatter(x=plot["Date"], y=plot["BB_Upper"], name="Upper Band", line=dict(dash="dash")))
+    fig.add_trace(go.Scatter(x=plot["Date"], y=plot["BB_Middle"], name="Middle Band"))
+    fig.add_trace(go.Scatter(x=plot["Date"], y=plot["BB_Lower"], name="Lower Band", line=dict(dash="dash")))
     fig.update_layout(title="Bollinger Bands (20, 2)")
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
-with tab6:
+def show_prediction(df, horizon):
     st.subheader("Simple Rule-Based Buy/Sell Signal")
-    latest = df.iloc[-1]
-    signals = []
-    if latest["RSI"] < 30: signals.append("Buy")
-    elif latest["RSI"] > 70: signals.append("Sell")
-    signals.append("Buy" if latest["MACD"] > latest["Signal"] else "Sell")
-    signals.append("Buy" if latest["Close"] > latest["SMA20"] else "Sell")
-    
-    buy_count = signals.count("Buy")
-    sell_count = signals.count("Sell")
-    overall = "🟢 Buy" if buy_count > sell_count else "🔴 Sell" if sell_count > buy_count else "🟡 Hold"
-    
+    # Read the last row straight from the column arrays (no Series materialization)
+    close, rsi, macd, sig, sma20 = (df[c].to_numpy()[-1] for c in ("Close", "RSI", "MACD", "Signal", "SMA20"))
+    # +1 per buy vote, -1 per sell vote; RSI only votes outside 30-70
+    score = int(rsi < 30) - int(rsi > 70) + 2 * int(macd > sig) - 1 + 2 * int(close > sma20) - 1
+    overall = "🟢 Buy" if score > 0 else "🔴 Sell" if score < 0 else "🟡 Hold"
+
     st.markdown(f"### Signal for next {horizon} day(s): **{overall}**")
-    st.write(f"Latest Close: ${latest['Close']:.2f} | RSI: {latest['RSI']:.1f}")
+    st.write(f"Latest Close: ${close:.2f} | RSI: {rsi:.1f}")
     st.caption("Educational only — not financial advice.")
+
+CHART_BUILDERS = {
+    "Candlestick + Volume": build_candlestick,
+    "Moving Averages": build_moving_averages,
+    "RSI": build_rsi,
+    "MACD": build_macd,
+    "Bollinger Bands": build_bollinger,
+}
+PREDICTION_VIEW = "Buy/Sell Prediction"
+
+# Switching views reruns only this fragment and builds only the selected figure
+@st.fragment
+def chart_panel(df, horizon):
+    view = st.radio("View", [*CHART_BUILDERS, PREDICTION_VIEW], horizontal=True, key="active_tab")
+    if view == PREDICTION_VIEW:
+        show_prediction(df, horizon)
+    else:
+        st.plotly_chart(CHART_BUILDERS[view](df), use_container_width=True)
+
+chart_panel(df, horizon)
@@ -0,0 +1,17 @@
+"""Ahead-of-time compile the indicator kernels into indicators_aot.so.
+
+Run `make aot` (or `python build_indicators.py`) at build time; app.py imports the
+compiled module when present and falls back to the JIT kernels in indicators.py.
+"""
+from pathlib import Path
+
+from numba.pycc import CC
+
+import indicators
+
+cc = CC("indicators_aot")
+cc.output_dir = str(Path(__file__).resolve().parent)
+cc.export("update_indicators", "f8[:,:](f8[:], f4[:], f4[:])")(indicators.update_indicators.py_func)
+
+if __name__ == "__main__":
+    cc.compile()
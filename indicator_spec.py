@@ -0,0 +1,14 @@
+# Layout shared by the JIT kernels (indicators.py) and their AOT build (indicators_aot).
+# Kept free of numba so the app can import it without paying the numba import.
+
+# Column order of the arrays returned by compute_all / update_indicators
+INDICATOR_COLUMNS = ["SMA20", "SMA50", "RSI", "MACD", "Signal", "MACD_Hist", "BB_Upper", "BB_Lower"]
+# Plain int so the Numba kernels can use it as a compile-time constant
+N_INDICATORS = len(INDICATOR_COLUMNS)
+
+# Carried state: [bars seen, ema12, ema26, signal, avg_gain, avg_loss]
+STATE_SIZE = 6
+# Trailing closes needed to rebuild the rolling windows (longest window - 1)
+TAIL = 49
+# Bump whenever the kernel's formulas change so persisted indicator caches are recomputed
+INDICATOR_VERSION = 1
@@ -0,0 +1,95 @@
+import numpy as np
+from numba import njit
+
+from indicator_spec import N_INDICATORS, STATE_SIZE
+
+@njit(cache=True)
+def _advance(close, n_ctx, state, out):
+    """Fold close[n_ctx:] into state, writing one indicator row per new bar into out.
+
+    close[:n_ctx] are the last bars already folded into state; they only refill
+    the rolling windows. The 20-bar window keeps a Welford mean/variance that
+    serves both SMA20 and the Bollinger Bands (BB_Middle is SMA20), the 50-bar
+    window a running sum, EMAs keep scalar state, and RSI uses Wilder smoothing
+    (alpha = 1/14). Rows before a window is full are NaN, like pandas' rolling().
+    """
+    a12, a26, a9, wilder = 2.0 / 13.0, 2.0 / 27.0, 2.0 / 10.0, 1.0 / 14.0
+    seen = int(state[0])
+    ema12, ema26, signal = state[1], state[2], state[3]
+    avg_gain, avg_loss = state[4], state[5]
+    sum50 = 0.0
+    mean20 = m2 = 0.0
+    for i in range(close.shape[0]):
+        x = float(close[i])
+        a = seen - n_ctx + i  # absolute bar index
+
+        # SMA 50 (SMA 20 comes from the Bollinger window below)
+        sum50 += x
+        if i >= 50:
+            sum50 -= close[i - 50]
+
+        # SMA 20 + Bollinger Bands (20, 2) - Welford mean/variance over a sliding window
+        if i < 20:
+            delta = x - mean20
+            mean20 += delta / (i + 1)
+            m2 += delta * (x - mean20)
+        else:
+            old = float(close[i - 20])
+            new_mean = mean20 + (x - old) / 20.0
+            m2 += (x - old) * (x - new_mean + old - mean20)
+            mean20 = new_mean
+
+        if i < n_ctx:
+            continue
+        row = out[i - n_ctx]
+
+        if a >= 49:
+            row[1] = sum50 / 50.0
+        if a >= 19:
+            std = np.sqrt(max(m2, 0.0) / 19.0)
+            row[0] = mean20
+            row[6] = mean20 + 2.0 * std
+            row[7] = mean20 - 2.0 * std
+
+        # RSI (14, Wilder)
+        if a > 0:
+            d = x - close[i - 1]
+            avg_gain += wilder * (max(d, 0.0) - avg_gain)
+            avg_loss += wilder * (max(-d, 0.0) - avg_loss)
+        if a >= 14:
+            if avg_loss > 0:
+                row[2] = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+            elif avg_gain > 0:
+                row[2] = 100.0
+
+        # MACD (12, 26, 9)
+        if a == 0:
+            ema12 = ema26 = x
+        else:
+            ema12 += a12 * (x - ema12)
+            ema26 += a26 * (x - ema26)
+        macd = ema12 - ema26
+        signal = macd if a == 0 else signal + a9 * (macd - signal)
+        row[3] = macd
+        row[4] = signal
+        row[5] = macd - signal
+
+    state[0] = seen + close.shape[0] - n_ctx
+    state[1], state[2], state[3] = ema12, ema26, signal
+    state[4], state[5] = avg_gain, avg_loss
+
+@njit(cache=True)
+def update_indicators(state, tail_close, new_close):
+    """Indicator rows for new_close, continuing from state (updated in place).
+
+    tail_close holds the last min(TAIL, bars seen) closes already in state, so a
+    one-bar refresh costs O(TAIL) instead of a pass over the full history.
+    """
+    out = np.full((new_close.shape[0], N_INDICATORS), np.nan)
+    _advance(np.concatenate((tail_close, new_close)), tail_close.shape[0], state, out)
+    return out
+
+@njit(cache=True)
+def compute_all(close):
+    """Walk close once and emit every indicator column (see INDICATOR_COLUMNS)."""
+    return update_indicators(np.zeros(STATE_SIZE), close[:0], close)
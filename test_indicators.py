@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from indicator_spec import INDICATOR_COLUMNS, STATE_SIZE, TAIL
+from indicators import compute_all, update_indicators
+
+
+@pytest.fixture
+def close():
+    rng = np.random.default_rng(0)
+    return (200 + np.cumsum(rng.normal(0, 3, 400))).astype(np.float32)
+
+
+def test_compute_all_matches_pandas(close):
+    s = pd.Series(close.astype(np.float64))
+    sma20, std20 = s.rolling(20).mean(), s.rolling(20).std()
+    d = s.diff().fillna(0)
+    avg_gain = d.clip(lower=0).ewm(alpha=1 / 14, adjust=False).mean()
+    avg_loss = (-d).clip(lower=0).ewm(alpha=1 / 14, adjust=False).mean()
+    rsi = 100 - 100 / (1 + avg_gain / avg_loss)
+    rsi[:14] = np.nan
+    macd = s.ewm(span=12, adjust=False).mean() - s.ewm(span=26, adjust=False).mean()
+    signal = macd.ewm(span=9, adjust=False).mean()
+    expected = {
+        "SMA20": sma20, "SMA50": s.rolling(50).mean(), "RSI": rsi,
+        "MACD": macd, "Signal": signal, "MACD_Hist": macd - signal,
+        "BB_Upper": sma20 + 2 * std20, "BB_Lower": sma20 - 2 * std20,
+    }
+    out = compute_all(close)
+    for k, col in enumerate(INDICATOR_COLUMNS):
+        np.testing.assert_allclose(out[:, k], expected[col].to_numpy(), atol=1e-8, err_msg=col)
+
+
+@pytest.mark.parametrize("split", [1, 5, 19, 30, 49, 50, 120, 399])
+def test_resume_matches_compute_all(close, split):
+    state = np.zeros(STATE_SIZE)
+    head = update_indicators(state, close[:0], close[:split])
+    tail = close[max(0, split - TAIL):split]
+    rest = update_indicators(state, tail, close[split:])
+    np.testing.assert_allclose(np.vstack([head, rest]), compute_all(close), atol=1e-10)